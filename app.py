@@ -1,77 +1,113 @@
 import os
-import sqlite3
-import pandas as pd
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
+from functools import lru_cache
 from dash import Dash, dcc, html, Input, Output, State
-import plotly.io as pio
-from dotenv import load_dotenv
-import requests
 from concurrent.futures import ThreadPoolExecutor  
+import figure_cache
+from query_plan import SOURCE_UTC_OFFSET, frappe_query_string, plan_frappe_query, response_sizes
 
-pio.templates.default = "plotly_dark"
+# pandas, plotly.graph_objects and requests are imported on first use so that
+# workers can start serving immediately; warm_up() loads them ahead of forking.
 
 app = Dash(__name__)
 server = app.server
-load_dotenv()
-api_url = os.getenv('API_URL')
-authorization_token = os.getenv('AUTHORIZATION_TOKEN')
-session = requests.Session()
-
-headers = {
-    'Accept': 'application/json',
-    'Content-Type': 'application/json',
-    'Authorization': f'token {authorization_token}'
-}
-
-app.layout = html.Div(
-    className='app-container',
-    children=[
-        html.H1("Aluecor Press Dashboard", className='app-heading'),
-
-        dcc.DatePickerSingle(
-            id='date-picker',
-            date=(datetime.now() - timedelta(1)).date(),
-            display_format='YYYY-MM-DD',
-            style={'margin': '20px'}
-        ),
 
-        dcc.Loading(
-            id="loading-spinner-generate",
-            type="circle",
-            children=[
-                html.Button('Generate Figure', id='generate-figure-btn', n_clicks=0),
-                html.Div(id='loading-status')
-            ],
-            fullscreen=False
-        ),
 
-        dcc.Loading(
-            id='loading-graphs',
-            type='circle',
-            children=[
-                html.Div(
-                    id='output-graph',
-                    style={'display': 'flex', 'flex-wrap': 'wrap', 'justify-content': 'space-around'}
-                ),
-            ]
-        ),
-    ]
-)
+@lru_cache(maxsize=None)
+def get_settings():
+    """Load the .env file once and return the API url and request headers."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    authorization_token = os.getenv('AUTHORIZATION_TOKEN')
+    headers = {
+        'Accept': 'application/json',
+        'Content-Type': 'application/json',
+        'Authorization': f'token {authorization_token}'
+    }
+    return os.getenv('API_URL'), headers
+
+
+@lru_cache(maxsize=None)
+def get_session():
+    import requests
+
+    return requests.Session()
+
+
+@lru_cache(maxsize=None)
+def warm_up():
+    """Import the heavy modules and apply the plot template.
+
+    Called lazily from the callbacks, and from gunicorn.conf.py before workers are
+    forked so every worker shares the loaded modules copy-on-write.
+    """
+    import pandas  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+    import plotly.io as pio
+
+    pio.templates.default = "plotly_dark"
+    get_settings()
+    get_session()
+
+
+def serve_layout():
+    return html.Div(
+        className='app-container',
+        children=[
+            html.H1("Aluecor Press Dashboard", className='app-heading'),
+
+            dcc.DatePickerSingle(
+                id='date-picker',
+                date=(datetime.now() - timedelta(1)).date(),
+                display_format='YYYY-MM-DD',
+                style={'margin': '20px'}
+            ),
+
+            dcc.Loading(
+                id="loading-spinner-generate",
+                type="circle",
+                children=[
+                    html.Button('Generate Figure', id='generate-figure-btn', n_clicks=0),
+                    html.Div(id='loading-status'),
+                    html.Button('Export Report', id='export-report-btn', n_clicks=0),
+                    dcc.Download(id='export-report-download'),
+                    html.Div(id='export-status')
+                ],
+                fullscreen=False
+            ),
+
+            dcc.Loading(
+                id='loading-graphs',
+                type='circle',
+                children=[
+                    html.Div(
+                        id='output-graph',
+                        style={'display': 'flex', 'flex-wrap': 'wrap', 'justify-content': 'space-around'}
+                    ),
+                ]
+            ),
+        ]
+    )
 
 
-def fetch_page(page, start_date, end_date, page_size):
-   
+app.layout = serve_layout
+
+
+def fetch_page(page, plan, page_size):
+    import requests
+
+    api_url, headers = get_settings()
     try:
-        filter_query = (f'?fields=["timestamp","extrusion_time","downtime_reasons"]'
-                        f'&filters=[["timestamp",">=","{start_date}"],'
-                        f'["timestamp","<=","{end_date}"]]'
-                        f'&limit={page_size}&offset={page * page_size}')
+        filter_query = frappe_query_string(plan, page, page_size)
         
-        response = requests.get(f'{api_url}{filter_query}', headers=headers)
+        response = get_session().get(f'{api_url}{filter_query}', headers=headers)
         response.raise_for_status()
         
-        return response.json().get('data', [])
+        data = response.json().get('data', [])
+        payload_bytes, wire_bytes = response_sizes(response)
+        print(f'Page {page}: {len(data)} rows, {payload_bytes} payload bytes, {wire_bytes} bytes transferred')
+        return data
     
     except requests.exceptions.RequestException as e:
         print(f"Error fetching page {page}: {str(e)}")
@@ -79,34 +115,36 @@ def fetch_page(page, start_date, end_date, page_size):
 
 
 def parse_frappe_api(selected_date):
-    start_date = f"{selected_date} 04:00:00"
-    end_date = f"{selected_date} 17:00:00"
+    import pandas as pd
+
+    warm_up()
+    plan = plan_frappe_query(selected_date)
     
     data = []  
     page = 0  
     page_size = 200000
 
-    initial_data = fetch_page(page, start_date, end_date, page_size)
+    initial_data = fetch_page(page, plan, page_size)
     data.extend(initial_data)
     
       
    
     with ThreadPoolExecutor() as executor:
-        results = list(executor.map(lambda p: fetch_page(p, start_date, end_date, page_size), range(page)))
+        results = list(executor.map(lambda p: fetch_page(p, plan, page_size), range(page)))
 
     for page_data in results:
         data.extend(page_data)
         
 
 
-    df = pd.DataFrame(data)
+    df = pd.DataFrame(data, columns=plan['fields'])
     print(f'Records for selected date {df.shape}')
     if df.empty:
         return "No data found for the selected date range."
     
     df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['timestamp'] = pd.to_datetime(df['timestamp'] + timedelta(hours=2))
-    df['extrusion_time'] = df['extrusion_time'].apply(cycle_times)
+    df['timestamp'] = pd.to_datetime(df['timestamp'] + SOURCE_UTC_OFFSET)
+    df['extrusion_time'] = cycle_times(df['extrusion_time'])
 
    
     df = df.sort_values(by='timestamp')
@@ -123,11 +161,12 @@ def format_time(hours):
     formatted_minutes = total_minutes % 60
     return f"{formatted_hours}:{formatted_minutes:02d}"  
 
-def cycle_times(raw_value):
+def cycle_times(raw_values):
+    """Scale a series of raw nanosecond readings to seconds, with missing readings as 0."""
+    import pandas as pd
+
     seconds_scaling_factor = 1e9
-    if pd.notnull(raw_value):
-        return (raw_value / seconds_scaling_factor)
-    return 0
+    return pd.to_numeric(raw_values).fillna(0) / seconds_scaling_factor
 
 def format_time(hours):
     """Format hours into a more readable string."""
@@ -136,9 +175,8 @@ def format_time(hours):
     minutes, seconds = divmod(remainder, 60)
     return f"{hours}h {minutes}m {seconds}s"
 
-def process_and_plot_data(df_cycle):
-    df_cycle['Timestamp'] = pd.to_datetime(df_cycle['timestamp'])
-    df_cycle['downtime_reasons'] = df_cycle['downtime_reasons']   
+def summarize_cycle_data(df_cycle):
+    """Compute the operational/downtime rollup shown in the bar chart."""
     total_hours = 10
 
     operational_time = ((df_cycle['extrusion_time'] >= 1).sum() * (1 / 60) ) / 60  
@@ -147,6 +185,29 @@ def process_and_plot_data(df_cycle):
     avg_cycle_time_minutes = 3  
     avg_cycle_time_seconds = avg_cycle_time_minutes * 60  
     number_of_cycles = (operational_time * 3600) / avg_cycle_time_seconds
+
+    return {
+        'records': len(df_cycle),
+        'operational_hours': operational_time,
+        'downtime_hours': downtime,
+        'number_of_cycles': number_of_cycles,
+        'downtime_events': int(df_cycle['downtime_reasons'].notna().sum()),
+    }
+
+def process_and_plot_data(df_cycle):
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    warm_up()
+    df_cycle['Timestamp'] = pd.to_datetime(df_cycle['timestamp'])
+    df_cycle['downtime_reasons'] = df_cycle['downtime_reasons']   
+
+    summary = summarize_cycle_data(df_cycle)
+    operational_time = summary['operational_hours']
+    downtime = summary['downtime_hours']
+
+    avg_cycle_time_minutes = 3  
+    avg_cycle_time_seconds = avg_cycle_time_minutes * 60  
    
    
     print(f'Average Cycle Time: {avg_cycle_time_minutes}')
@@ -231,12 +292,23 @@ def process_and_plot_data(df_cycle):
 )
 def update_output(n_clicks, selected_date):
     if n_clicks > 0:
+        cached = figure_cache.load_figures(selected_date)
+        if cached is not None:
+            line_fig, bar_fig, created_at = cached
+            age_hours = (datetime.now() - created_at).total_seconds() / 3600
+            return [
+                html.P(f"Pre-computed at {created_at:%Y-%m-%d %H:%M} ({age_hours:.1f} h old)",
+                       style={'width': '100%'}),
+                dcc.Graph(figure=line_fig),
+                dcc.Graph(figure=bar_fig)
+            ]
+
         df_cycle = parse_frappe_api(selected_date)
+        if isinstance(df_cycle, str): 
+            return html.Div([html.P(df_cycle)])
         df_cycle = df_cycle.drop_duplicates()
         print(df_cycle.head())  
         print(f'Unique Reseasons:{df_cycle[df_cycle["downtime_reasons"].notna()]}')
-        if isinstance(df_cycle, str): 
-            return html.Div([html.P(df_cycle)])
 
         line_fig, bar_fig = process_and_plot_data(df_cycle)
 
@@ -247,5 +319,27 @@ def update_output(n_clicks, selected_date):
 
     return html.Div([html.P("Select a date and press 'Generate Figure'.")])
 
+@app.callback(
+    Output('export-report-download', 'data'),
+    Output('export-status', 'children'),
+    Input('export-report-btn', 'n_clicks'),
+    State('date-picker', 'date'),
+    prevent_initial_call=True
+)
+def export_report(n_clicks, selected_date):
+    from export import build_report_archive
+
+    archive = build_report_archive(selected_date)
+    if archive is None:
+        return None, html.P(f"No data found for {selected_date}, nothing to export.")
+    return dcc.send_bytes(archive, f'press_report_{selected_date}.zip'), None
+
+@server.route('/prewarm-status')
+def prewarm_status():
+    status = figure_cache.read_status()
+    if status is None:
+        return {'status': 'never run'}, 404
+    return status
+
 if __name__ == '__main__':
     app.run_server(debug=True)
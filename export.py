@@ -0,0 +1,188 @@
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import figure_cache
+from app import parse_frappe_api, process_and_plot_data, summarize_cycle_data
+
+RAW_COLUMNS = ['timestamp', 'extrusion_time', 'downtime_reasons']
+RAW_FORMATS = ('parquet', 'csv')
+IMAGE_FORMATS = ('png', 'pdf', 'svg')
+
+
+def date_range(start_date, end_date):
+    """Yield every date between start_date and end_date inclusive as YYYY-MM-DD."""
+    start = pd.to_datetime(start_date).date()
+    end = pd.to_datetime(end_date).date()
+    day = start
+    while day <= end:
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+
+def write_raw(df, path, raw_format):
+    """Write the raw cycle records for one day."""
+    df = df[RAW_COLUMNS]
+    if raw_format == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def export_day(selected_date, out_dir, raw_format='parquet', image_format='png'):
+    """Export raw data, summary and chart images for a single day.
+
+    Returns the summary row for the day, or None when there is no data.
+    """
+    df_cycle = parse_frappe_api(selected_date)
+    if isinstance(df_cycle, str):
+        return None
+    df_cycle = df_cycle.drop_duplicates()
+
+    day_dir = os.path.join(out_dir, selected_date)
+    os.makedirs(day_dir, exist_ok=True)
+
+    raw_path = os.path.join(day_dir, f'raw.{raw_format}')
+    write_raw(df_cycle, raw_path, raw_format)
+
+    cached = figure_cache.load_figures(selected_date)
+    line_fig, bar_fig = cached[:2] if cached is not None else process_and_plot_data(df_cycle)
+    if image_format:
+        line_fig.write_image(os.path.join(day_dir, f'extrusion_time.{image_format}'))
+        bar_fig.write_image(os.path.join(day_dir, f'operational_overview.{image_format}'))
+
+    summary = {'date': selected_date, **summarize_cycle_data(df_cycle)}
+    pd.DataFrame([summary]).to_csv(os.path.join(day_dir, 'summary.csv'), index=False)
+
+    return summary
+
+
+def _export_day_job(args):
+    return export_day(*args)
+
+
+def append_raw(writer, raw_path, combined_path, raw_format):
+    """Append one day's raw file to the combined range file without loading the range."""
+    if raw_format == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ('timestamp', pa.timestamp('ns')),
+            ('extrusion_time', pa.float64()),
+            ('downtime_reasons', pa.string()),
+        ])
+        if writer is None:
+            writer = pq.ParquetWriter(combined_path, schema)
+        writer.write_table(pq.read_table(raw_path).cast(schema))
+        return writer
+
+    write_header = not os.path.exists(combined_path)
+    with open(raw_path, 'r') as src, open(combined_path, 'a') as dst:
+        header = src.readline()
+        if write_header:
+            dst.write(header)
+        shutil.copyfileobj(src, dst)
+    return writer
+
+
+def export_range(start_date, end_date, out_dir, raw_format='parquet', image_format='png', workers=None):
+    """Export daily reports for a date range plus a combined raw file and rollup summary.
+
+    Days are rendered in parallel across processes; each worker only holds a single
+    day in memory and the combined raw file is streamed together day by day. A day
+    that fails is reported and left out, and the combined file is always closed.
+    """
+    if raw_format not in RAW_FORMATS:
+        raise ValueError(f"Unsupported raw format: {raw_format}")
+    if image_format and image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+
+    days = list(date_range(start_date, end_date))
+    if not days:
+        raise ValueError(f"End date {end_date} is before start date {start_date}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(day, out_dir, raw_format, image_format) for day in days]
+
+    combined_path = os.path.join(out_dir, f'raw_{days[0]}_{days[-1]}.{raw_format}')
+    if os.path.exists(combined_path):
+        os.remove(combined_path)
+
+    summaries = []
+    failed = []
+    writer = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_export_day_job, job) for job in jobs]
+            for day, future in zip(days, futures):
+                try:
+                    summary = future.result()
+                    if summary is None:
+                        print(f"No data for {day}, skipping.")
+                        continue
+                    raw_path = os.path.join(out_dir, day, f'raw.{raw_format}')
+                    writer = append_raw(writer, raw_path, combined_path, raw_format)
+                except Exception as e:
+                    print(f"Export for {day} failed: {str(e)}")
+                    failed.append(day)
+                    continue
+                summaries.append(summary)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    rollup = pd.DataFrame(summaries)
+    rollup_path = os.path.join(out_dir, f'summary_{days[0]}_{days[-1]}.csv')
+    rollup.to_csv(rollup_path, index=False)
+    print(f'Exported {len(summaries)} of {len(days)} days to {out_dir}')
+    if failed:
+        print(f'Failed days: {", ".join(failed)}')
+
+    return rollup
+
+
+def build_report_archive(selected_date, raw_format='csv', image_format='png'):
+    """Export a single day and return it as zip bytes for the dashboard download."""
+    tmp_dir = tempfile.mkdtemp(prefix='press_dash_export_')
+    try:
+        summary = export_day(selected_date, tmp_dir, raw_format, image_format)
+        if summary is None:
+            return None
+
+        buffer = io.BytesIO()
+        day_dir = os.path.join(tmp_dir, selected_date)
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name in sorted(os.listdir(day_dir)):
+                archive.write(os.path.join(day_dir, name), arcname=f'{selected_date}/{name}')
+        return buffer.getvalue()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    yesterday = (datetime.now() - timedelta(1)).date().isoformat()
+
+    parser = argparse.ArgumentParser(description='Export daily press reports.')
+    parser.add_argument('--start', default=yesterday, help='First day to export (YYYY-MM-DD).')
+    parser.add_argument('--end', help='Last day to export (YYYY-MM-DD), defaults to --start.')
+    parser.add_argument('--out', default='reports', help='Output directory.')
+    parser.add_argument('--format', dest='raw_format', choices=RAW_FORMATS, default='parquet')
+    parser.add_argument('--images', dest='image_format', choices=IMAGE_FORMATS + ('none',), default='png')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes.')
+    args = parser.parse_args(argv)
+
+    image_format = None if args.image_format == 'none' else args.image_format
+    export_range(args.start, args.end or args.start, args.out,
+                 args.raw_format, image_format, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import json
+import os
+from datetime import datetime
+
+from query_plan import PLAN_VERSION
+
+CACHE_DIR = os.getenv('FIGURE_CACHE_DIR', 'cache')
+STATUS_FILE = 'prewarm_status.json'
+WINDOW_CLOSE_HOUR = 17
+CACHE_TTL_HOURS = float(os.getenv('FIGURE_CACHE_TTL_HOURS', '24'))
+
+
+def window_closed(selected_date, now=None):
+    """Return True once the 07:00-17:00 window for selected_date is over and the data is final."""
+    now = now or datetime.now()
+    closes_at = datetime.strptime(str(selected_date)[:10], '%Y-%m-%d').replace(hour=WINDOW_CLOSE_HOUR)
+    return now >= closes_at
+
+
+def _cache_path(selected_date):
+    return os.path.join(CACHE_DIR, f'figures_{str(selected_date)[:10]}_{PLAN_VERSION}.json')
+
+
+def _write_json(path, payload):
+    """Write atomically so concurrent gunicorn workers never read a partial file."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def load_figures(selected_date, now=None):
+    """Return the cached (line_fig, bar_fig, created_at) for selected_date, or None on a miss.
+
+    Entries older than CACHE_TTL_HOURS are treated as misses so rows that arrived
+    after the pre-warm are picked up by a live fetch.
+    """
+    path = _cache_path(selected_date)
+    if not os.path.exists(path):
+        return None
+    import plotly.io as pio
+
+    try:
+        with open(path) as f:
+            payload = json.load(f)
+        created_at = datetime.fromisoformat(payload['created_at'])
+        if ((now or datetime.now()) - created_at).total_seconds() > CACHE_TTL_HOURS * 3600:
+            return None
+        return pio.from_json(payload['line']), pio.from_json(payload['bar']), created_at
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable figure cache {path}: {str(e)}")
+        return None
+
+
+def store_figures(selected_date, line_fig, bar_fig):
+    """Cache the rendered figures for a day whose window has closed.
+
+    Only the pre-warm job writes entries; dashboard clicks only read them.
+    """
+    if not window_closed(selected_date):
+        return False
+    import plotly.io as pio
+
+    _write_json(_cache_path(selected_date), {
+        'date': str(selected_date)[:10],
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'line': pio.to_json(line_fig),
+        'bar': pio.to_json(bar_fig),
+    })
+    return True
+
+
+def write_status(status):
+    _write_json(os.path.join(CACHE_DIR, STATUS_FILE), status)
+
+
+def read_status():
+    """Return the last pre-warm report with its age in seconds, or None if it never ran."""
+    path = os.path.join(CACHE_DIR, STATUS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        status = json.load(f)
+    finished_at = datetime.fromisoformat(status['finished_at'])
+    status['age_seconds'] = int((datetime.now() - finished_at).total_seconds())
+    return status
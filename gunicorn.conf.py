@@ -0,0 +1,23 @@
+import os
+
+# Load the app once in the master and fork workers from it, so restarts and new
+# workers share the imported modules copy-on-write instead of importing them again.
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8050')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+preload_app = True
+wsgi_app = 'app:server'
+
+
+def when_ready(server):
+    from app import warm_up
+
+    warm_up()
+
+
+def post_worker_init(worker):
+    # Started per worker after forking; the lock in prewarm.run_forever keeps a
+    # single active scheduler per cache directory.
+    if os.getenv('PREWARM_SCHEDULER') == '1':
+        from prewarm import start_scheduler
+
+        start_scheduler()
@@ -1,11 +1,12 @@
 import sqlite3
 import pandas as pd
-from datetime import datetime, time
+from datetime import datetime, timedelta
 import plotly.graph_objects as go
 from dash import Dash, dcc, html, Input, Output, callback, State
 import base64
 import io
 import plotly.io as pio
+from query_plan import plan_sqlite_trend_query
 
 
 pio.templates.default = "plotly_dark"
@@ -105,22 +106,8 @@ def parse_sqlite(contents,start_date,end_date):
             f.write(decoded)
 
         conn = sqlite3.connect('uploaded_db_cycle.sqlite')
-        query = f"""
-            SELECT 
-                strftime('%Y-%m-%d %H:%M', datetime(TS / 1000000, 'unixepoch', 'UTC')) AS TS,
-                AVG(Val1) AS Val1,
-                AVG(Val2) AS Val2,
-                AVG(Val3) AS Val3
-            FROM 
-                TblTrendData
-            WHERE 
-                datetime(TS / 1000000, 'unixepoch', 'UTC') BETWEEN '{start_date} 06:00:00' AND '{end_date} 18:00:00'
-            GROUP BY 
-                CAST(strftime('%s', datetime(TS / 1000000, 'unixepoch', 'UTC')) / (1* 60) AS INTEGER)
-            ORDER BY 
-                TS;
-        """
-        df = pd.read_sql_query(query, conn)
+        query, params = plan_sqlite_trend_query(['Val1', 'Val2', 'Val3'], start_date, end_date)
+        df = pd.read_sql_query(query, conn, params=params)
         conn.close()
         df['Val1'] = df['Val1'].apply(convert_to_pressure)
         df['Val2'] = df['Val2'].apply(convert_to_pressure)
@@ -140,25 +127,8 @@ def parse_thermocouple(contents,start_date,end_date):
             temp_db.write(decoded)
 
         conn = sqlite3.connect('uploaded_db_thermocouple.sqlite')
-        query = f"""
-            SELECT 
-                strftime('%Y-%m-%d %H:%M', datetime(TS / 1000000, 'unixepoch', 'UTC')) AS TS,
-                AVG(Val1) AS Val1,
-                AVG(Val2) AS Val2,
-                AVG(Val3) AS Val3,
-                AVG(Val4) AS Val4,
-                AVG(Val5) AS Val5,
-                AVG(Val6) AS Val6
-            FROM 
-                TblTrendData
-            WHERE 
-                datetime(TS / 1000000, 'unixepoch', 'UTC') BETWEEN '{start_date} 06:00:00' AND '{end_date} 18:00:00'
-            GROUP BY 
-                CAST(strftime('%s', datetime(TS / 1000000, 'unixepoch', 'UTC')) / (1*60) AS INTEGER)
-            ORDER BY 
-                TS;
-        """
-        df_thermocouple = pd.read_sql_query(query, conn)
+        query, params = plan_sqlite_trend_query(['Val1', 'Val2', 'Val3', 'Val4', 'Val5', 'Val6'], start_date, end_date)
+        df_thermocouple = pd.read_sql_query(query, conn, params=params)
         conn.close()
         return df_thermocouple
 
@@ -184,9 +154,6 @@ def process_and_plot_data(df_cycle, df_thermocouple, start_date, end_date):
     filtered_cycle = df_cycle[(df_cycle['Timestamp'] >= start_date) & (df_cycle['Timestamp'] <= end_date)]
     filtered_thermocouple = df_thermocouple[(df_thermocouple['Timestamp'] >= start_date) & (df_thermocouple['Timestamp'] <= end_date)]
 
-    
-    filtered_cycle = filtered_cycle[filtered_cycle['Timestamp'].dt.time.between(time(6, 0), time(18, 0))]
-    filtered_thermocouple = filtered_thermocouple[filtered_thermocouple['Timestamp'].dt.time.between(time(6, 0), time(18, 0))]
 
   
     fig1 = go.Figure()
@@ -0,0 +1,128 @@
+import argparse
+import fcntl
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import figure_cache
+
+PREWARM_DELAY_MINUTES = int(os.getenv('PREWARM_DELAY_MINUTES', '15'))
+LOCK_FILE = 'prewarm.lock'
+LOCK_RETRY_SECONDS = 600
+
+
+def prewarm(selected_date):
+    """Fetch, normalize and render the figures for selected_date into the figure cache."""
+    from app import parse_frappe_api, process_and_plot_data
+
+    started = time.perf_counter()
+    df_cycle = parse_frappe_api(selected_date)
+    records = 0
+    cached = False
+    if not isinstance(df_cycle, str):
+        df_cycle = df_cycle.drop_duplicates()
+        records = len(df_cycle)
+        line_fig, bar_fig = process_and_plot_data(df_cycle)
+        cached = figure_cache.store_figures(selected_date, line_fig, bar_fig)
+
+    status = {
+        'date': str(selected_date),
+        'records': records,
+        'cached': cached,
+        'duration_seconds': round(time.perf_counter() - started, 3),
+        'finished_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    figure_cache.write_status(status)
+    print(f"Pre-warmed {status['date']}: {records} records in {status['duration_seconds']}s")
+    return status
+
+
+def next_run(now=None):
+    """Return when the next pre-warm should start: shortly after today's window closes."""
+    now = now or datetime.now()
+    run_at = now.replace(hour=figure_cache.WINDOW_CLOSE_HOUR, minute=0, second=0, microsecond=0)
+    run_at += timedelta(minutes=PREWARM_DELAY_MINUTES)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+def last_closed_date(now=None):
+    """The most recent day whose window has closed, i.e. the day the dashboard defaults to next."""
+    now = now or datetime.now()
+    day = now.date()
+    if not figure_cache.window_closed(day, now):
+        day -= timedelta(days=1)
+    return day.isoformat()
+
+
+def acquire_scheduler_lock():
+    """Take an exclusive lock in CACHE_DIR so only one scheduler runs per cache directory.
+
+    Returns the open lock file, which must stay open for as long as the lock is held,
+    or None if another process already holds it.
+    """
+    os.makedirs(figure_cache.CACHE_DIR, exist_ok=True)
+    lock_file = open(os.path.join(figure_cache.CACHE_DIR, LOCK_FILE), 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def run_forever():
+    """Warm the last closed day immediately if missing, then once per day after 17:00.
+
+    Waits while another process holds the scheduler lock, so that one can take over
+    if the current scheduler exits.
+    """
+    lock_file = acquire_scheduler_lock()
+    while lock_file is None:
+        time.sleep(LOCK_RETRY_SECONDS)
+        lock_file = acquire_scheduler_lock()
+
+    day = last_closed_date()
+    if figure_cache.load_figures(day) is None:
+        _safe_prewarm(day)
+
+    while True:
+        run_at = next_run()
+        time.sleep(max((run_at - datetime.now()).total_seconds(), 0))
+        _safe_prewarm(last_closed_date())
+
+
+def _safe_prewarm(selected_date):
+    try:
+        prewarm(selected_date)
+    except Exception as e:
+        print(f"Pre-warm for {selected_date} failed: {str(e)}")
+
+
+def start_scheduler():
+    """Run the pre-warm loop in a daemon thread of the current process.
+
+    Only call this from an entry point (gunicorn.conf.py's post_worker_init), never at
+    import time, so it is not started in the preloading master or by re-imports.
+    """
+    thread = threading.Thread(target=run_forever, name='prewarm-scheduler', daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-warm the dashboard cache for the last closed day.")
+    parser.add_argument('--date', help='Day to pre-warm (YYYY-MM-DD), defaults to the last closed day.')
+    parser.add_argument('--loop', action='store_true', help='Keep running and pre-warm every day after 17:00.')
+    args = parser.parse_args(argv)
+
+    if args.loop:
+        run_forever()
+    else:
+        prewarm(args.date or last_closed_date())
+
+
+if __name__ == '__main__':
+    main()
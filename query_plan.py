@@ -0,0 +1,160 @@
+import argparse
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+
+# The dashboard shows 07:00-17:00 local time; the source stores timestamps two
+# hours behind, which parse_frappe_api adds back after fetching.
+SHIFT_START = time(7, 0)
+SHIFT_END = time(17, 0)
+SOURCE_UTC_OFFSET = timedelta(hours=2)
+
+CYCLE_FIELDS = ['timestamp', 'extrusion_time', 'downtime_reasons']
+
+# Changes whenever the window or projection changes what a rendered figure contains,
+# so figures cached under an older plan are not served.
+PLAN_VERSION = hashlib.sha1(
+    json.dumps([str(SHIFT_START), str(SHIFT_END), str(SOURCE_UTC_OFFSET), CYCLE_FIELDS]).encode()
+).hexdigest()[:8]
+
+
+def shift_window(selected_date, start=SHIFT_START, end=SHIFT_END, offset=SOURCE_UTC_OFFSET):
+    """Return the (start, end) source timestamps covering the displayed shift window."""
+    day = datetime.strptime(str(selected_date)[:10], '%Y-%m-%d')
+    window_start = datetime.combine(day, start) - offset
+    window_end = datetime.combine(day, end) - offset
+    return window_start.strftime('%Y-%m-%d %H:%M:%S'), window_end.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def plan_frappe_query(selected_date, fields=CYCLE_FIELDS):
+    """Build the Frappe list query parameters for one day.
+
+    The shift window and projection are pushed into ``filters``/``fields`` and rows
+    are requested as lists (``as_dict=0``) so field names are not repeated per row.
+    """
+    window_start, window_end = shift_window(selected_date)
+    plan = {
+        'fields': list(fields),
+        'filters': [
+            ['timestamp', '>=', window_start],
+            ['timestamp', '<=', window_end],
+        ],
+        'order_by': 'timestamp asc',
+        'as_dict': 0,
+    }
+    return plan
+
+
+def frappe_query_string(plan, page, page_size):
+    """Render a query plan as the query string appended to the resource url."""
+    params = [
+        f'fields={json.dumps(plan["fields"], separators=(",", ":"))}',
+        f'filters={json.dumps(plan["filters"], separators=(",", ":"))}',
+        f'order_by={plan["order_by"]}',
+        f'as_dict={plan["as_dict"]}',
+    ]
+    params.append(f'limit={page_size}&offset={page * page_size}')
+    return '?' + '&'.join(params)
+
+
+def plan_sqlite_trend_query(columns, start_date, end_date, day_start=time(6, 0), day_end=time(18, 0),
+                            bucket_seconds=60):
+    """Build the SQLite trend query for TblTrendData with the window pushed into SQL.
+
+    The date range is compared on the raw microsecond ``TS`` column so an index
+    can be used, the daily time window replaces the pandas ``between`` filter, and
+    rows are averaged into ``bucket_seconds`` buckets by ``GROUP BY``. The bucket
+    starting at ``day_end`` is kept whole on every day, including the last one,
+    where the previous SQL stopped at ``day_end`` exactly.
+
+    ``TS`` is microseconds since the Unix epoch, so labels and the time window are
+    read in UTC with ``'unixepoch'`` alone. The previous ``'unixepoch', 'UTC'``
+    treated that UTC value as host local time and shifted it by the host's UTC
+    offset; both forms agree only on a host running in UTC.
+    """
+    epoch = datetime(1970, 1, 1)
+    bucket = timedelta(seconds=bucket_seconds)
+    range_start = datetime.combine(datetime.strptime(str(start_date)[:10], '%Y-%m-%d'), day_start)
+    range_end = datetime.combine(datetime.strptime(str(end_date)[:10], '%Y-%m-%d'), day_end) + bucket
+    window_end = (datetime.combine(epoch, day_end) + bucket).time()
+    averages = ',\n            '.join(f'AVG({col}) AS {col}' for col in columns)
+
+    query = f"""
+        SELECT
+            strftime('%Y-%m-%d %H:%M', MIN(TS) / 1000000, 'unixepoch') AS TS,
+            {averages}
+        FROM
+            TblTrendData
+        WHERE
+            TS >= ? AND TS < ?
+            AND time(TS / 1000000, 'unixepoch') >= ?
+            AND time(TS / 1000000, 'unixepoch') < ?
+        GROUP BY
+            CAST(TS / ? AS INTEGER)
+        ORDER BY
+            TS;
+    """
+    params = (
+        int((range_start - epoch).total_seconds() * 1e6),
+        int((range_end - epoch).total_seconds() * 1e6),
+        day_start.strftime('%H:%M:%S'),
+        window_end.strftime('%H:%M:%S'),
+        bucket_seconds * 1000000,
+    )
+    return query, params
+
+
+def response_sizes(response):
+    """Return (payload_bytes, wire_bytes) for a fully read requests response.
+
+    ``response.content`` is already decompressed, so the bytes that crossed the
+    network are taken from urllib3's read counter, falling back to Content-Length.
+    """
+    payload_bytes = len(response.content)
+    try:
+        wire_bytes = response.raw.tell()
+    except (AttributeError, OSError):
+        wire_bytes = int(response.headers.get('Content-Length', payload_bytes))
+    return payload_bytes, wire_bytes
+
+
+def measure_pushdown(selected_date):
+    """Fetch one day with the old unfiltered query and the planned one and report the reduction."""
+    from app import get_session, get_settings
+
+    api_url, headers = get_settings()
+    legacy_query = (f'?fields={json.dumps(CYCLE_FIELDS, separators=(",", ":"))}'
+                    f'&filters=[["timestamp",">=","{selected_date} 04:00:00"],'
+                    f'["timestamp","<=","{selected_date} 17:00:00"]]'
+                    f'&limit=200000&offset=0')
+    planned_query = frappe_query_string(plan_frappe_query(selected_date), 0, 200000)
+
+    results = {}
+    for name, query in (('legacy', legacy_query), ('planned', planned_query)):
+        response = get_session().get(f'{api_url}{query}', headers=headers)
+        response.raise_for_status()
+        payload_bytes, wire_bytes = response_sizes(response)
+        results[name] = {
+            'payload_bytes': payload_bytes,
+            'wire_bytes': wire_bytes,
+            'rows': len(response.json().get('data', [])),
+        }
+
+    for key in ('wire_bytes', 'payload_bytes', 'rows'):
+        before, after = results['legacy'][key], results['planned'][key]
+        reduction = (1 - after / before) * 100 if before else 0
+        print(f'{key}: {before} -> {after} ({reduction:.1f}% less)')
+    return results
+
+
+def main(argv=None):
+    yesterday = (datetime.now() - timedelta(1)).date().isoformat()
+
+    parser = argparse.ArgumentParser(description='Measure the effect of query pushdown for one day.')
+    parser.add_argument('--date', default=yesterday, help='Day to measure (YYYY-MM-DD).')
+    args = parser.parse_args(argv)
+    measure_pushdown(args.date)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ('pandas', 'plotly.graph_objects', 'requests', 'sqlite3')
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', '1500'))
+
+
+def measure_import(module='app'):
+    """Import module in a fresh interpreter with -X importtime.
+
+    Returns the total import time in ms and the set of top-level modules imported.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    total_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.rstrip()
+        imported.add(name.strip())
+        # top-level entries have a single leading space and add up to the whole import
+        if len(name) - len(name.lstrip()) == 1:
+            total_us += int(cumulative)
+    return total_us / 1000, imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the dashboard startup import budget.')
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument('--module', default='app')
+    args = parser.parse_args(argv)
+
+    total_ms, imported = measure_import(args.module)
+    eager = sorted(m for m in HEAVY_MODULES if m in imported)
+    print(f'import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)')
+
+    failed = False
+    if eager:
+        print(f'Heavy modules imported at startup: {", ".join(eager)}')
+        failed = True
+    if total_ms > args.budget_ms:
+        print('Startup budget exceeded.')
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
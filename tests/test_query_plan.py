@@ -0,0 +1,31 @@
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from query_plan import plan_sqlite_trend_query
+
+
+def _trend_table(column_type, sample_seconds=20):
+    conn = sqlite3.connect(':memory:')
+    conn.execute(f'CREATE TABLE TblTrendData (TS {column_type}, Val1 REAL)')
+    day_start = (datetime(2024, 10, 1) - datetime(1970, 1, 1)).total_seconds()
+    conn.executemany(
+        'INSERT INTO TblTrendData VALUES (?, ?)',
+        [((day_start + s) * 1e6, s) for s in range(0, 86400, sample_seconds)],
+    )
+    return conn
+
+
+def test_sqlite_trend_query_buckets_per_minute():
+    for column_type in ('INTEGER', 'REAL'):
+        conn = _trend_table(column_type)
+        query, params = plan_sqlite_trend_query(['Val1'], '2024-10-01', '2024-10-01')
+        rows = conn.execute(query, params).fetchall()
+
+        # 06:00 through the whole 18:00 minute
+        assert len(rows) == 721
+        assert rows[0][0] == '2024-10-01 06:00'
+        assert rows[-1][0] == '2024-10-01 18:00'
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from startup_budget import HEAVY_MODULES, STARTUP_BUDGET_MS, measure_import
+
+pytest.importorskip('dash')
+
+
+def test_app_import_skips_heavy_modules():
+    _, imported = measure_import('app')
+    assert not [m for m in HEAVY_MODULES if m in imported]
+
+
+def test_app_import_within_budget():
+    total_ms, _ = measure_import('app')
+    assert total_ms <= STARTUP_BUDGET_MS